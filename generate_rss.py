@@ -1,113 +1,103 @@
 import re
 import sys
-import html
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from email.utils import format_datetime
 
-import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
+from urllib3.util.retry import Retry
+
+from rss_utils import (
+    SITE,
+    guess_image_mime,
+    is_post_url,
+    normalize_url,
+    parse_date_es,
+    parse_date_iso,
+)
 
 
-SITE = "https://ultimasgeek.com/"
 OUTFILE = "rss.xml"
 MAX_ITEMS = 25
 TIMEOUT = 25
+# Descargas de posts en paralelo (no abusar del sitio)
+MAX_WORKERS = 10
+
+# Caché HTTP en disco (se persiste entre corridas con actions/cache)
+CACHE_FILE = "rss_cache.sqlite"
+CACHE_EXPIRE = 3600
+# Entradas más viejas que esto se borran (posts que ya salieron de la home).
+# No usar expired=True: borraría los ETag de los que dependen los 304.
+CACHE_MAX_AGE = dt.timedelta(days=7)
 
 # Dónde se publica el feed (GitHub Pages)
 FEED_URL = "https://franvillafanez.github.io/ultimasgeek-rss/rss.xml"
+ATOM_NS = "http://www.w3.org/2005/Atom"
 
-# Páginas que NO son artículos (ajustá si aparecen otras)
-BLOCKED_SLUGS = {
-    "lo-ultimo",
-    "nota-de-voz",
-    "contacto",
-    "about",
-}
-
-# Prefijos típicos que no son posts
-BLOCKED_PREFIXES = (
-    "category/",
-    "tag/",
-    "page/",
-    "author/",
-    "wp-",
-)
+# Caracteres que XML 1.0 no admite
+_XML_INVALID_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Escape HTML en una sola pasada (mismo resultado que html.escape)
+_HTML_ESC = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+# <a href="..."> (WordPress siempre usa comillas dobles); solo anchors,
+# así no entran los <link> del <head> (feed, xmlrpc, etc.)
+_HREF_RE = re.compile(r'<a\s(?:[^>]*?\s)?href="([^"]+)"', re.IGNORECASE)
 
-MONTHS_ES = {
-    "enero": 1,
-    "febrero": 2,
-    "marzo": 3,
-    "abril": 4,
-    "mayo": 5,
-    "junio": 6,
-    "julio": 7,
-    "agosto": 8,
-    "septiembre": 9,
-    "setiembre": 9,
-    "octubre": 10,
-    "noviembre": 11,
-    "diciembre": 12,
-}
-
-session = requests.Session()
+# Respeta ETag/Last-Modified: lo que no cambió vuelve como 304 o sale del caché.
+# La home se revalida siempre para no perder posts nuevos.
+session = requests_cache.CachedSession(
+    CACHE_FILE,
+    cache_control=True,
+    expire_after=CACHE_EXPIRE,
+    urls_expire_after={re.compile("^" + re.escape(SITE) + "$"): requests_cache.EXPIRE_IMMEDIATELY},
+)
 session.headers.update(
     {
         "User-Agent": "ultimasgeek-rss-bot/1.0 (+https://github.com/franvillafanez/ultimasgeek-rss)"
     }
 )
+# Un slot de conexión por worker y reintentos ante errores transitorios
+adapter = HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET"],
+    ),
+)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
 
 
 def fetch(url: str) -> str:
+    # sin stream=True: requests-cache lee el cuerpo entero para guardarlo igual
     r = session.get(url, timeout=TIMEOUT)
     r.raise_for_status()
     return r.text
 
 
-def normalize_url(url: str) -> str:
-    # saca query/hash para deduplicar bien
-    if not url:
-        return url
-    url = url.split("#", 1)[0].split("?", 1)[0]
-    return url
-
-
-def is_post_url(url: str) -> bool:
-    if not url or not url.startswith(SITE):
-        return False
-
-    clean = normalize_url(url)
-    path = clean[len(SITE):].strip("/")  # slug o slug/subslug
-
-    if not path:
-        return False
-
-    # bloqueos por prefijo (category/tag/etc.)
-    if any(path.startswith(p) for p in BLOCKED_PREFIXES):
-        return False
-
-    # paginación
-    if "/page/" in path:
-        return False
-
-    # bloquear slugs exactos de secciones
-    if path in BLOCKED_SLUGS:
-        return False
-
-    # descartar assets obvios
-    if any(path.endswith(ext) for ext in (".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg", ".pdf")):
-        return False
-
-    return True
-
-
 def extract_post_urls_from_home(home_html: str) -> list[str]:
-    soup = BeautifulSoup(home_html, "html.parser")
+    # regex directo sobre el HTML: no hace falta armar el árbol
     urls = []
-    for a in soup.select("a[href]"):
-        href = (a.get("href") or "").strip()
+    for href in _HREF_RE.findall(home_html):
+        href = href.strip()
         if is_post_url(href):
             urls.append(normalize_url(href))
 
+    # fallback por si cambia el markup (comillas simples, sin comillas)
+    if not urls:
+        tree = LexborHTMLParser(home_html)
+        for a in tree.css("a[href]"):
+            href = (a.attributes.get("href") or "").strip()
+            if is_post_url(href):
+                urls.append(normalize_url(href))
+
     # dedupe conservando orden
     seen = set()
     out = []
@@ -119,40 +109,6 @@ def extract_post_urls_from_home(home_html: str) -> list[str]:
     return out
 
 
-def parse_date_es(text: str) -> dt.datetime | None:
-    """
-    Busca fecha tipo: "27 enero, 2026" dentro del texto.
-    """
-    m = re.search(r"(\d{1,2})\s+([a-záéíóúñ]+)\s*,\s*(\d{4})", text, re.IGNORECASE)
-    if not m:
-        return None
-
-    day = int(m.group(1))
-    mon_name = m.group(2).lower()
-    year = int(m.group(3))
-
-    mon = MONTHS_ES.get(mon_name)
-    if not mon:
-        return None
-
-    # zona Argentina (-03) y lo pasamos a UTC para pubDate
-    tz_ar = dt.timezone(dt.timedelta(hours=-3))
-    return dt.datetime(year, mon, day, 12, 0, 0, tzinfo=tz_ar).astimezone(dt.timezone.utc)
-
-
-def guess_image_mime(url: str) -> str:
-    u = (url or "").lower().split("?", 1)[0].split("#", 1)[0]
-    if u.endswith(".png"):
-        return "image/png"
-    if u.endswith(".webp"):
-        return "image/webp"
-    if u.endswith(".gif"):
-        return "image/gif"
-    if u.endswith(".svg"):
-        return "image/svg+xml"
-    return "image/jpeg"
-
-
 def parse_post(post_url: str) -> dict | None:
     try:
         post_html = fetch(post_url)
@@ -160,47 +116,62 @@ def parse_post(post_url: str) -> dict | None:
         print(f"[WARN] No pude bajar {post_url}: {e}", file=sys.stderr)
         return None
 
-    soup = BeautifulSoup(post_html, "html.parser")
-
-    def get_meta_property(prop: str) -> str:
-        tag = soup.find("meta", attrs={"property": prop})
-        return (tag.get("content") or "").strip() if tag else ""
-
-    def get_meta_name(name: str) -> str:
-        tag = soup.find("meta", attrs={"name": name})
-        return (tag.get("content") or "").strip() if tag else ""
+    def read_metas(tree: LexborHTMLParser) -> dict[str, str]:
+        # metas en una sola pasada (property= para OG, name= para description)
+        metas = {}
+        for m in tree.css("meta"):
+            attrs = m.attributes
+            content = (attrs.get("content") or "").strip()
+            for key in (attrs.get("property"), attrs.get("name")):
+                if key and key not in metas:
+                    metas[key] = content
+        return metas
+
+    # Primero solo el <head>: con los OG de Yoast y article:published_time
+    # casi siempre alcanza. Si falta título, descripción o fecha ISO,
+    # parseamos la página entera (h1 / p / fecha en el texto del body).
+    head_html, end_head, _ = post_html.partition("</head>")
+    tree = LexborHTMLParser(head_html + end_head)
+    metas = read_metas(tree)
+    published = parse_date_iso(metas.get("article:published_time", ""))
+    if not (
+        published
+        and metas.get("og:title")
+        and (metas.get("og:description") or metas.get("description"))
+    ):
+        tree = LexborHTMLParser(post_html)
+        metas = read_metas(tree)
+        published = parse_date_iso(metas.get("article:published_time", ""))
+
+    def get_text(selector: str) -> str:
+        node = tree.css_first(selector)
+        return node.text(separator=" ", strip=True) if node else ""
 
     # Título: OG -> h1 -> title
-    title = get_meta_property("og:title")
-    if not title:
-        h1 = soup.find("h1")
-        if h1 and h1.get_text(strip=True):
-            title = h1.get_text(" ", strip=True)
-    if not title:
-        t = soup.find("title")
-        if t and t.get_text(strip=True):
-            title = t.get_text(" ", strip=True)
+    title = metas.get("og:title", "") or get_text("h1") or get_text("title")
 
     if not title:
         return None
 
     # Descripción: OG -> meta description -> primer párrafo
-    desc = get_meta_property("og:description") or get_meta_name("description") or ""
+    desc = metas.get("og:description") or metas.get("description") or ""
     if not desc:
-        p = soup.find("p")
-        if p:
-            desc = p.get_text(" ", strip=True)
+        desc = get_text("p")
 
     desc = (desc or "").strip()
     if len(desc) > 300:
         desc = desc[:300].rstrip() + "…"
 
     # Imagen: OG image
-    image_url = (get_meta_property("og:image") or "").strip()
+    image_url = metas.get("og:image", "")
 
-    # Fecha: buscar dentro del texto completo
-    text_all = soup.get_text("\n", strip=True)
-    published = parse_date_es(text_all) or dt.datetime.now(dt.timezone.utc)
+    # Fecha: article:published_time (ISO-8601) -> texto visible del body -> ahora.
+    # El regex va sobre el texto y no sobre el HTML crudo: en el markup la fecha
+    # puede venir partida por tags o con &nbsp;, y hay atributos/scripts que confunden.
+    # Sin fecha ISO, arriba ya se parseó la página entera, así que tree.body existe.
+    if not published and tree.body:
+        published = parse_date_es(tree.body.text(separator="\n", strip=True))
+    published = published or dt.datetime.now(dt.timezone.utc)
 
     return {
         "title": title,
@@ -212,68 +183,62 @@ def parse_post(post_url: str) -> dict | None:
     }
 
 
-def build_rss(items: list[dict]) -> str:
+def build_rss(items: list[dict]) -> etree._Element:
     now = format_datetime(dt.datetime.now(dt.timezone.utc))
 
-    def esc_cdata(s: str) -> str:
-        # CDATA no puede contener "]]>"
-        return (s or "").replace("]]>", "]]]]><![CDATA[>")
+    def cdata(s: str):
+        # XML no admite caracteres de control; CDATA no puede contener "]]>"
+        s = _XML_INVALID_RE.sub("", s or "")
+        return etree.CDATA(s) if "]]>" not in s else s
 
-    rss_items = []
+    def esc(s: str) -> str:
+        return s.translate(_HTML_ESC)
+
+    rss = etree.Element("rss", version="2.0", nsmap={"atom": ATOM_NS})
+    channel = etree.SubElement(rss, "channel")
+    etree.SubElement(channel, "title").text = "Últimas Geek"
+    etree.SubElement(channel, "link").text = SITE
+    etree.SubElement(
+        channel, f"{{{ATOM_NS}}}link", href=FEED_URL, rel="self", type="application/rss+xml"
+    )
+    etree.SubElement(channel, "description").text = "Feed generado automáticamente desde la home"
+    etree.SubElement(channel, "lastBuildDate").text = now
 
     for it in items:
-        link = html.escape(it["link"])
-        guid = html.escape(it["guid"])
-        title = esc_cdata(it["title"])
-        desc_text = esc_cdata(it.get("description", ""))
+        item = etree.SubElement(channel, "item")
+        etree.SubElement(item, "title").text = cdata(it["title"])
+        etree.SubElement(item, "link").text = it["link"]
+        etree.SubElement(item, "guid", isPermaLink="true").text = it["guid"]
+        etree.SubElement(item, "pubDate").text = it["pubDate"]
 
         img_html = ""
-        enclosure = ""
-
         img_url = (it.get("image_url") or "").strip()
         if img_url.startswith("http"):
-            img_url_esc = html.escape(img_url)
-            img_html = f'<p><img src="{img_url_esc}" alt="{html.escape(it["title"])}" /></p>'
-            enclosure = f'\n      <enclosure url="{img_url_esc}" type="{guess_image_mime(img_url)}" />'
+            img_html = f'<p><img src="{esc(img_url)}" alt="{esc(it["title"])}" /></p>'
 
         # description en HTML (CDATA) para que muchos lectores muestren imagen + texto
+        desc_text = it.get("description", "")
         description_html = f"{img_html}<p>{desc_text}</p>" if desc_text else img_html
+        etree.SubElement(item, "description").text = cdata(description_html)
 
-        rss_items.append(
-            f"""
-    <item>
-      <title><![CDATA[{title}]]></title>
-      <link>{link}</link>
-      <guid isPermaLink="true">{guid}</guid>
-      <pubDate>{it["pubDate"]}</pubDate>
-      <description><![CDATA[{description_html}]]></description>{enclosure}
-    </item>
-""".rstrip()
-        )
-
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
-  <channel>
-    <title>Últimas Geek</title>
-    <link>{SITE}</link>
-    <atom:link href="{FEED_URL}" rel="self" type="application/rss+xml" />
-    <description>Feed generado automáticamente desde la home</description>
-    <lastBuildDate>{now}</lastBuildDate>
-{chr(10).join(rss_items)}
-  </channel>
-</rss>
-"""
+        if img_html:
+            etree.SubElement(item, "enclosure", url=img_url, type=guess_image_mime(img_url))
+
+    return rss
 
 
 def main():
     home_html = fetch(SITE)
     urls = extract_post_urls_from_home(home_html)
 
+    # bajamos en paralelo; map() conserva el orden de la home
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        results = list(ex.map(parse_post, urls[: MAX_ITEMS * 2]))
+
     items = []
     seen = set()
 
-    for u in urls:
-        it = parse_post(u)
+    for it in results:
         if not it:
             continue
 
@@ -289,8 +254,11 @@ def main():
 
     rss = build_rss(items)
 
-    with open(OUTFILE, "w", encoding="utf-8") as f:
-        f.write(rss)
+    # lxml serializa directo al archivo, sin armar el documento entero en memoria
+    etree.ElementTree(rss).write(OUTFILE, xml_declaration=True, encoding="UTF-8", pretty_print=True)
+
+    # que el caché no crezca para siempre
+    session.cache.delete(older_than=CACHE_MAX_AGE)
 
     print(f"OK: generé {OUTFILE} con {len(items)} items")
 
@@ -0,0 +1,160 @@
+"""
+Helpers puros (sin red ni HTML) de generate_rss.py.
+
+Están en un módulo aparte para poder compilarlos con mypyc; si no hay
+extensión compilada, Python importa este .py tal cual.
+"""
+
+import re
+import datetime as dt
+from functools import lru_cache
+from types import MappingProxyType
+
+
+SITE = "https://ultimasgeek.com/"
+
+# Páginas que NO son artículos (ajustá si aparecen otras)
+BLOCKED_SLUGS = frozenset(
+    {
+        "lo-ultimo",
+        "nota-de-voz",
+        "contacto",
+        "about",
+        "feed",
+        "xmlrpc.php",
+    }
+)
+
+# Prefijos típicos que no son posts
+BLOCKED_PREFIXES = (
+    "category/",
+    "tag/",
+    "page/",
+    "author/",
+    "wp-",
+    "feed/",
+    "comments/",
+)
+
+# Extensiones de assets que no son posts
+ASSET_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg", ".pdf")
+
+MONTHS_ES = MappingProxyType(
+    {
+        "enero": 1,
+        "febrero": 2,
+        "marzo": 3,
+        "abril": 4,
+        "mayo": 5,
+        "junio": 6,
+        "julio": 7,
+        "agosto": 8,
+        "septiembre": 9,
+        "setiembre": 9,
+        "octubre": 10,
+        "noviembre": 11,
+        "diciembre": 12,
+    }
+)
+
+# Filtros de is_post_url en una sola pasada del motor de regex
+_BLOCKED_PREFIX_RE = re.compile("|".join(re.escape(p) for p in BLOCKED_PREFIXES))
+_ASSET_RE = re.compile("(?:" + "|".join(re.escape(e) for e in ASSET_EXTENSIONS) + ")$")
+
+# Fecha tipo "27 enero, 2026"
+_DATE_RE = re.compile(r"(\d{1,2})\s+([a-záéíóúñ]+)\s*,\s*(\d{4})", re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def normalize_url(url: str) -> str:
+    # saca query/hash para deduplicar bien
+    if not url:
+        return url
+    url = url.split("#", 1)[0].split("?", 1)[0]
+    return url
+
+
+@lru_cache(maxsize=2048)
+def is_post_url(url: str) -> bool:
+    if not url or not url.startswith(SITE):
+        return False
+
+    clean = normalize_url(url)
+    path = clean[len(SITE):].strip("/")  # slug o slug/subslug
+
+    if not path:
+        return False
+
+    # bloqueos por prefijo (category/tag/etc.)
+    if _BLOCKED_PREFIX_RE.match(path):
+        return False
+
+    # paginación
+    if "/page/" in path:
+        return False
+
+    # feed de comentarios de un post (slug/feed)
+    if path.endswith("/feed"):
+        return False
+
+    # bloquear slugs exactos de secciones
+    if path in BLOCKED_SLUGS:
+        return False
+
+    # descartar assets obvios
+    if _ASSET_RE.search(path):
+        return False
+
+    return True
+
+
+def parse_date_es(text: str) -> dt.datetime | None:
+    """
+    Busca fecha tipo: "27 enero, 2026" dentro del texto.
+    Saltea coincidencias que no son fechas ("Top 10 juegos, 2026", "31 febrero, 2026").
+    """
+    # zona Argentina (-03) y lo pasamos a UTC para pubDate
+    tz_ar = dt.timezone(dt.timedelta(hours=-3))
+
+    for m in _DATE_RE.finditer(text):
+        mon = MONTHS_ES.get(m.group(2).lower())
+        if not mon:
+            continue
+
+        try:
+            d = dt.datetime(int(m.group(3)), mon, int(m.group(1)), 12, 0, 0, tzinfo=tz_ar)
+        except ValueError:
+            continue
+        return d.astimezone(dt.timezone.utc)
+
+    return None
+
+
+def parse_date_iso(text: str) -> dt.datetime | None:
+    """
+    Parsea fechas ISO-8601 como las de article:published_time
+    ("2026-01-27T12:00:00-03:00") y las pasa a UTC.
+    """
+    try:
+        d = dt.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+    # sin offset: asumimos zona Argentina (-03), igual que parse_date_es
+    if d.tzinfo is None:
+        d = d.replace(tzinfo=dt.timezone(dt.timedelta(hours=-3)))
+    return d.astimezone(dt.timezone.utc)
+
+
+@lru_cache(maxsize=2048)
+def guess_image_mime(url: str) -> str:
+    u = (url or "").lower().split("?", 1)[0].split("#", 1)[0]
+    if u.endswith(".png"):
+        return "image/png"
+    if u.endswith(".webp"):
+        return "image/webp"
+    if u.endswith(".gif"):
+        return "image/gif"
+    if u.endswith(".svg"):
+        return "image/svg+xml"
+    return "image/jpeg"